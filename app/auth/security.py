@@ -6,6 +6,7 @@ from jose import JWTError, jwt
 from pydantic import ValidationError
 
 from app.core.config import settings
+from app.core.profiling import profile_phase
 from app.models.mentoria import TokenData, UserType
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token") # "token" é um endpoint fictício para o Swagger UI
@@ -27,7 +28,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData:
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        with profile_phase("auth"):
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         username: Optional[str] = payload.get("username")
         user_type_str: Optional[str] = payload.get("type")
 
@@ -49,6 +51,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData:
         raise credentials_exception
     except ValidationError: # Pydantic validation error for TokenData
         raise credentials_exception
+
     return token_data
 
 
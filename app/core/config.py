@@ -18,6 +18,26 @@ class Settings(BaseSettings):
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 
+    # Log de queries lentas (ver app/database/instrumentation.py)
+    SLOW_QUERY_THRESHOLD_MS: float = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 200))
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 0.1))
+    SLOW_QUERY_LOG_SIZE: int = int(os.getenv("SLOW_QUERY_LOG_SIZE", 200))
+
+    # Agrupamento de inscrições/desinscrições em um único commit (ver app/database/batching.py)
+    ENROLLMENT_BATCHING: bool = os.getenv("ENROLLMENT_BATCHING", "false").lower() in ("1", "true", "yes")
+    ENROLLMENT_BATCH_WINDOW_MS: float = float(os.getenv("ENROLLMENT_BATCH_WINDOW_MS", 5))
+    ENROLLMENT_BATCH_MAX_SIZE: int = int(os.getenv("ENROLLMENT_BATCH_MAX_SIZE", 100))
+
+    # Janela padrão (a partir de agora) usada para expandir ocorrências de séries nas listagens
+    SERIES_DEFAULT_WINDOW_DAYS: int = int(os.getenv("SERIES_DEFAULT_WINDOW_DAYS", 30))
+    # Janela máxima aceita nas listagens (janelas maiores recebem 422)
+    SERIES_MAX_WINDOW_DAYS: int = int(os.getenv("SERIES_MAX_WINDOW_DAYS", 366))
+
+    # Profiling por requisição, ativado por admins com o header X-Profile-Request (ver app/core/profiling.py)
+    PROFILE_SAMPLE_INTERVAL_MS: float = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", 1))
+    PROFILE_MAX_SECONDS: float = float(os.getenv("PROFILE_MAX_SECONDS", 30))
+    PROFILE_STORE_SIZE: int = int(os.getenv("PROFILE_STORE_SIZE", 50))
+
 settings = Settings()
 
 # Para teste rápido, imprima as configurações ao carregar o módulo
@@ -0,0 +1,80 @@
+from typing import Optional
+
+from jose import JWTError, jwt
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.models.mentoria import UserType
+from app.core.profiling import current_profile, profile_store, RequestProfile, PROFILE_HEADER, PROFILE_ID_HEADER
+from app.database.instrumentation import current_scope, route_label
+
+_PROFILE_HEADER_KEY = PROFILE_HEADER.lower().encode("latin-1")
+
+
+class RequestContextMiddleware:
+    """
+    Middleware ASGI puro (sem a task e o stream extras do BaseHTTPMiddleware):
+    - guarda o scope da requisição, de onde o log de queries lentas tira a rota;
+    - se o header X-Profile-Request traz um token Admin válido, perfila a requisição, seja qual for
+      a autenticação da rota. Requisições sem o header não fazem mais nada.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = current_scope.set(scope)
+        try:
+            profile_token = _profile_header(scope)
+            if profile_token is None or not _is_admin_token(profile_token):
+                await self.app(scope, receive, send)
+                return
+            await self._profiled(scope, receive, send)
+        finally:
+            current_scope.reset(token)
+
+    async def _profiled(self, scope: Scope, receive: Receive, send: Send):
+        profile = RequestProfile(f"{scope['method']} {scope['path']}")
+
+        async def send_with_profile_id(message: Message):
+            # O início da resposta marca o fim da serialização
+            if message["type"] == "http.response.start" and profile.active:
+                profile.stop()
+                # Requisições barradas antes do endpoint (401, 403, 422, 404 de rota) não geram profile
+                if profile.endpoint_ran:
+                    profile.route = route_label(scope)
+                    profile_store.append(profile)
+                    MutableHeaders(scope=message).append(PROFILE_ID_HEADER, profile.id)
+            await send(message)
+
+        context_token = current_profile.set(profile)
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            current_profile.reset(context_token)
+            profile.stop()
+
+
+def _profile_header(scope: Scope) -> Optional[str]:
+    for name, value in scope["headers"]:
+        if name == _PROFILE_HEADER_KEY:
+            return value.decode("latin-1")
+    return None
+
+
+def _is_admin_token(value: str) -> bool:
+    """O valor do header é o token JWT de um Admin (com ou sem o prefixo "Bearer ")."""
+    token = value.strip()
+    if token[:7].lower() == "bearer ":
+        token = token[7:].strip()
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return False
+    return payload.get("type") == UserType.ADMIN.value
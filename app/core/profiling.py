@@ -0,0 +1,188 @@
+import asyncio
+import functools
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+
+from app.core.config import settings
+from app.models.admin import ProfilePhase, ProfileSummary
+
+# Header que pede o profiling da requisição. O valor é um token JWT de Admin, verificado pelo
+# RequestContextMiddleware independente da autenticação da rota; sem um token Admin válido é ignorado.
+PROFILE_HEADER = "X-Profile-Request"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# Profile da requisição atual; None quando o header não foi enviado (caso comum, custo zero)
+current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("current_profile", default=None)
+
+# Últimos profiles concluídos
+profile_store: deque = deque(maxlen=settings.PROFILE_STORE_SIZE)
+
+_NULL_PHASE = nullcontext()
+
+
+class RequestProfile:
+    """
+    Profiling de uma única requisição por amostragem: uma thread lê a pilha da thread do
+    event loop a cada PROFILE_SAMPLE_INTERVAL_MS e conta as pilhas no formato "collapsed"
+    (compatível com flamegraph.pl / speedscope). Cada pilha começa com as fases ativas
+    (auth, pool_acquire, query, endpoint, ...), marcadas pelo código da aplicação.
+    Como o event loop é compartilhado, amostras de outras requisições rodando ao mesmo tempo
+    podem aparecer dentro das fases desta.
+    """
+
+    def __init__(self, route: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.route = route
+        self.timestamp = datetime.now(timezone.utc)
+        self.active = False
+        self.endpoint_ran = False # Só profiles de requisições que chegaram ao endpoint são guardados
+        self.samples: Counter = Counter()
+        self.phases: List[ProfilePhase] = []
+        self._stack: List[Tuple[str, float]] = []
+        self._started = 0.0
+        self._ended = 0.0
+        self._thread_id: Optional[int] = None
+        self._sampler: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def start(self):
+        """Chamado pelo RequestContextMiddleware depois de validar o token Admin do header."""
+        if self.active:
+            return
+        self._started = time.perf_counter()
+        self.active = True
+        # Até o endpoint rodar: autenticação da rota, demais dependências e validação do corpo/parâmetros
+        self._stack.append(("validacao_entrada", self._started))
+
+        self._thread_id = threading.get_ident()
+        self._sampler = threading.Thread(target=self._sample_loop, name=f"profile-{self.id}", daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        if not self.active:
+            return
+        self.active = False
+        self._stop_event.set()
+        self._ended = time.perf_counter()
+        while self._stack:
+            self._pop(self._ended)
+        if self._sampler is not None:
+            self._sampler.join(timeout=1)
+
+    @contextmanager
+    def phase(self, name: str):
+        self._stack.append((name, time.perf_counter()))
+        try:
+            yield
+        finally:
+            self._pop(time.perf_counter())
+
+    def switch(self, name: str):
+        """Troca a fase de nível mais alto (ex: endpoint -> serialização)."""
+        now = time.perf_counter()
+        while self._stack:
+            self._pop(now)
+        self._stack.append((name, now))
+
+    def summary(self) -> ProfileSummary:
+        return ProfileSummary(
+            id=self.id,
+            timestamp=self.timestamp,
+            route=self.route,
+            duration_ms=round((self._ended - self._started) * 1000, 3),
+            sample_count=sum(self.samples.values()),
+            phases=self.phases
+        )
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def _pop(self, now: float):
+        if not self._stack:
+            return
+        path = ";".join(name for name, _ in self._stack)
+        _, started = self._stack.pop()
+        self._record(path, started, now)
+
+    def _record(self, name: str, started: float, ended: float):
+        self.phases.append(ProfilePhase(
+            name=name,
+            start_ms=round((started - self._started) * 1000, 3),
+            duration_ms=round((ended - started) * 1000, 3)
+        ))
+
+    def _sample_loop(self):
+        interval = settings.PROFILE_SAMPLE_INTERVAL_MS / 1000
+        deadline = time.perf_counter() + settings.PROFILE_MAX_SECONDS
+        while not self._stop_event.wait(interval):
+            if time.perf_counter() > deadline:
+                break
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            frames.reverse()
+            phases = [f"[{name}]" for name, _ in list(self._stack)]
+            self.samples[";".join(phases + frames)] += 1
+
+
+def profile_phase(name: str):
+    """Marca uma fase da requisição atual; não faz nada se ela não estiver sendo perfilada."""
+    profile = current_profile.get()
+    if profile is None or not profile.active:
+        return _NULL_PHASE
+    return profile.phase(name)
+
+
+def get_profile(profile_id: str) -> Optional[RequestProfile]:
+    for profile in profile_store:
+        if profile.id == profile_id:
+            return profile
+    return None
+
+
+def get_profiles() -> List[ProfileSummary]:
+    # Mais recentes primeiro
+    return [profile.summary() for profile in reversed(profile_store)]
+
+
+def _profiled_endpoint(endpoint):
+    # include_router pode recriar a rota com o endpoint já envolvido; não envolve de novo
+    if getattr(endpoint, "__profiled__", False) or not asyncio.iscoroutinefunction(endpoint):
+        return endpoint
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        profile = current_profile.get()
+        if profile is None or not profile.active:
+            return await endpoint(*args, **kwargs)
+        profile.endpoint_ran = True
+        profile.switch("endpoint")
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            # O que vem depois do endpoint é a validação do response_model e a serialização
+            profile.switch("validacao_serializacao")
+    wrapper.__profiled__ = True
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """route_class dos routers: marca as fases "endpoint" e "validacao_serializacao" do profiling."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _profiled_endpoint(endpoint), **kwargs)
@@ -1,9 +1,13 @@
 from typing import List, Optional
+from datetime import datetime
 import asyncpg
 from pydantic import EmailStr
 from app.models.mentoria import MentoriaCreate, MentoriaUpdate, MentoriaInDB, MentoradoEmail, MentoriaStatus, UserType, MentoradoInMentoria
 from enum import Enum
 from contextlib import _AsyncGeneratorContextManager # Para type hinting, se desejar
+from app.database.batching import enrollment_batcher
+from app.crud import serie_crud
+from app.core.config import settings
 
 # --- Mentorias ---
 
@@ -16,7 +20,7 @@ async def create_mentoria(
         query = """
             INSERT INTO mentorias (mentor_email, data_hora, duracao_minutos, status, topico, titulo, descricao)
             VALUES ($1, $2, $3, $4, $5, $6, $7)
-            RETURNING id, mentor_email, data_hora, duracao_minutos, status, topico, titulo, descricao;
+            RETURNING id, mentor_email, data_hora, duracao_minutos, status, topico, titulo, descricao, serie_id;
         """
         row = await conn.fetchrow( # <--- Agora conn é o objeto de conexão
             query,
@@ -36,38 +40,62 @@ async def create_mentoria(
 async def get_mentorias_by_user(
     db_conn_manager: _AsyncGeneratorContextManager[asyncpg.Connection],
     email: str,
-    type: UserType
+    type: UserType,
+    inicio: Optional[datetime] = None,
+    fim: Optional[datetime] = None
 ) -> List[MentoriaInDB]:
     async with db_conn_manager as conn:
         if(type == UserType.MENTOR):
             query = """
-                SELECT id, mentor_email, data_hora, duracao_minutos, status, topico, titulo, descricao
+                SELECT id, mentor_email, data_hora, duracao_minutos, status, topico, titulo, descricao, serie_id
                 FROM mentorias
                 WHERE mentor_email = $1 ORDER BY data_hora DESC;
             """
         else:
             query = """
-                SELECT id, mentor_email, data_hora, duracao_minutos, status, topico, titulo, descricao
+                SELECT id, mentor_email, data_hora, duracao_minutos, status, topico, titulo, descricao, serie_id
                 FROM mentorias
                 WHERE id IN (SELECT mentoria_id FROM mentoria_mentorados WHERE mentorado_email = $1) ORDER BY data_hora DESC;
             """
         rows = await conn.fetch(query, email)
+        mentorias = [MentoriaInDB.model_validate(dict(row)) for row in rows]
 
-        return [MentoriaInDB.model_validate(dict(row)) for row in rows]
+        if type == UserType.MENTOR:
+            # Ocorrências das séries do mentor, expandidas só dentro da janela [inicio, fim]
+            mentorias = _merge_occurrences(mentorias, await serie_crud.list_virtual_occurrences(
+                conn, mentor_email=email, inicio=inicio, fim=fim,
+                default_window_days=settings.SERIES_DEFAULT_WINDOW_DAYS,
+                max_window_days=settings.SERIES_MAX_WINDOW_DAYS
+            ))
+
+        return mentorias
 
 async def get_mentorias_by_topic(
     db_conn_manager: _AsyncGeneratorContextManager[asyncpg.Connection],
-    topic: str
+    topic: str,
+    inicio: Optional[datetime] = None,
+    fim: Optional[datetime] = None
 ) -> List[MentoriaInDB]:
     async with db_conn_manager as conn:
         query = """
-            SELECT id, mentor_email, data_hora, duracao_minutos, status, topico, titulo, descricao
+            SELECT id, mentor_email, data_hora, duracao_minutos, status, topico, titulo, descricao, serie_id
             FROM mentorias
             WHERE topico = $1 ORDER BY data_hora DESC;
         """
         rows = await conn.fetch(query, topic)
+        mentorias = [MentoriaInDB.model_validate(dict(row)) for row in rows]
+
+        return _merge_occurrences(mentorias, await serie_crud.list_virtual_occurrences(
+            conn, topic=topic, inicio=inicio, fim=fim,
+            default_window_days=settings.SERIES_DEFAULT_WINDOW_DAYS,
+            max_window_days=settings.SERIES_MAX_WINDOW_DAYS
+        ))
 
-        return [MentoriaInDB.model_validate(dict(row)) for row in rows]
+def _merge_occurrences(mentorias: List[MentoriaInDB], occurrences: List[MentoriaInDB]) -> List[MentoriaInDB]:
+    # Mantém a ordenação das listagens (data_hora DESC)
+    if not occurrences:
+        return mentorias
+    return sorted(mentorias + occurrences, key=lambda m: serie_crud.naive_utc(m.data_hora), reverse=True)
 
 
 async def get_mentoria_by_id(
@@ -76,7 +104,7 @@ async def get_mentoria_by_id(
 ) -> Optional[MentoriaInDB]:
     async with db_conn_manager as conn:
         query = """
-            SELECT id, mentor_email, data_hora, duracao_minutos, status, topico, titulo, descricao
+            SELECT id, mentor_email, data_hora, duracao_minutos, status, topico, titulo, descricao, serie_id
             FROM mentorias
             WHERE id = $1;
         """
@@ -111,7 +139,7 @@ async def update_mentoria(
         if not update_fields:
             # Se não houver campos para atualizar, podemos buscar e retornar a mentoria completa
             full_mentoria_record = await conn.fetchrow(
-                "SELECT id, mentor_email, data_hora, duracao_minutos, status, topico, titulo, descricao FROM mentorias WHERE id = $1;",
+                "SELECT id, mentor_email, data_hora, duracao_minutos, status, topico, titulo, descricao, serie_id FROM mentorias WHERE id = $1;",
                 mentoria_id
             )
 
@@ -137,7 +165,7 @@ async def update_mentoria(
             UPDATE mentorias
             SET {', '.join(set_clauses)}
             WHERE id = ${param_idx} AND mentor_email = ${param_idx + 1}
-            RETURNING id, mentor_email, data_hora, duracao_minutos, status, topico, titulo, descricao;
+            RETURNING id, mentor_email, data_hora, duracao_minutos, status, topico, titulo, descricao, serie_id;
         """
         row = await conn.fetchrow(query, *values)
         
@@ -168,6 +196,10 @@ async def add_mentorado_to_mentoria(
     mentoria_id: int,
     mentorado_email: str
 ) -> bool:
+    if enrollment_batcher.enabled:
+        # Agrupa com outras inscrições concorrentes em um único commit (a conexão não é usada)
+        return await enrollment_batcher.add(mentoria_id, mentorado_email)
+
     async with db_conn_manager as conn:
         query_insert = """
             INSERT INTO mentoria_mentorados (mentoria_id, mentorado_email)
@@ -188,6 +220,14 @@ async def remove_mentorado_from_mentoria(
     current_user_email: str,
     current_user_type: UserType
 ) -> bool:
+    if enrollment_batcher.enabled:
+        # A verificação de proprietário do mentor é feita dentro do DELETE em lote
+        if current_user_type == UserType.MENTOR:
+            if not mentorado_email_obj:
+                return False
+            return await enrollment_batcher.remove(mentoria_id, mentorado_email_obj.mentorado_email, owner_email=current_user_email)
+        return await enrollment_batcher.remove(mentoria_id, current_user_email)
+
     async with db_conn_manager as conn:
         if(current_user_type == UserType.MENTOR):
             mentoria_record = await conn.fetchrow(
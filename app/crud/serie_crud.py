@@ -0,0 +1,298 @@
+from typing import List, Optional, Tuple, Union
+from datetime import datetime, timedelta, timezone
+import asyncpg
+from app.models.mentoria import SerieCreate, SerieInDB, SerieFrequencia, MentoriaInDB
+from contextlib import _AsyncGeneratorContextManager
+
+# As séries guardam só a regra de recorrência e as exceções. As ocorrências são calculadas
+# sob demanda, apenas dentro da janela pedida, e viram uma linha em `mentorias` somente
+# quando alguém se inscreve ou quando o mentor edita a ocorrência.
+
+SERIE_COLUMNS = "id, mentor_email, data_inicio, data_fim, frequencia, intervalo, excecoes, duracao_minutos, status, topico, titulo, descricao"
+
+
+def naive_utc(value: datetime) -> datetime:
+    """As colunas são TIMESTAMP (sem fuso); datas com fuso são convertidas para UTC."""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _step(serie: SerieInDB) -> timedelta:
+    days = 1 if serie.frequencia == SerieFrequencia.DIARIA else 7
+    return timedelta(days=days * serie.intervalo)
+
+
+def resolve_window(
+    inicio: Optional[datetime],
+    fim: Optional[datetime],
+    default_window_days: int,
+    max_window_days: int
+) -> Tuple[datetime, datetime]:
+    """
+    Aplica os padrões da janela de expansão (agora .. agora + default_window_days) e a valida.
+    Levanta ValueError se fim < inicio ou se a janela passar de max_window_days,
+    para que o custo da listagem continue limitado pelo tamanho da janela.
+    """
+    try:
+        inicio = naive_utc(inicio if inicio is not None else datetime.now(timezone.utc))
+        fim = naive_utc(fim) if fim is not None else inicio + timedelta(days=default_window_days)
+    except OverflowError:
+        raise ValueError("Invalid series window")
+    if fim < inicio:
+        raise ValueError("fim must not be earlier than inicio")
+    if fim - inicio > timedelta(days=max_window_days):
+        raise ValueError(f"Series window must not exceed {max_window_days} days")
+    return inicio, fim
+
+
+def expand_occurrences(serie: SerieInDB, inicio: datetime, fim: datetime) -> List[datetime]:
+    """
+    Ocorrências da série entre `inicio` e `fim` (inclusive), sem as exceções.
+    Pula direto para a primeira ocorrência da janela, então o custo depende só do tamanho da janela.
+    """
+    start = naive_utc(serie.data_inicio)
+    end = naive_utc(fim)
+    if serie.data_fim is not None:
+        end = min(end, naive_utc(serie.data_fim))
+    inicio = naive_utc(inicio)
+
+    step = _step(serie)
+    # Garante que `occurrence += step` nunca passe de datetime.max
+    end = min(end, datetime.max - step)
+    if inicio > end:
+        return []
+    k = 0 if inicio <= start else -((start - inicio) // step) # ceil((inicio - start) / step)
+    occurrence = start + k * step
+
+    excecoes = {naive_utc(e) for e in serie.excecoes}
+    occurrences = []
+    while occurrence <= end:
+        if occurrence not in excecoes:
+            occurrences.append(occurrence)
+        occurrence += step
+    return occurrences
+
+
+def is_occurrence(serie: SerieInDB, ocorrencia: datetime) -> bool:
+    """Verifica se `ocorrencia` cai na regra da série (ignorando as exceções)."""
+    start = naive_utc(serie.data_inicio)
+    ocorrencia = naive_utc(ocorrencia)
+    if ocorrencia < start:
+        return False
+    if serie.data_fim is not None and ocorrencia > naive_utc(serie.data_fim):
+        return False
+    return (ocorrencia - start) % _step(serie) == timedelta(0)
+
+
+def occurrence_to_mentoria(serie: SerieInDB, ocorrencia: datetime) -> MentoriaInDB:
+    return MentoriaInDB(
+        id=None,
+        serie_id=serie.id,
+        mentor_email=serie.mentor_email,
+        data_hora=ocorrencia,
+        duracao_minutos=serie.duracao_minutos,
+        status=serie.status,
+        topico=serie.topico,
+        titulo=serie.titulo,
+        descricao=serie.descricao
+    )
+
+
+async def list_virtual_occurrences(
+    conn: asyncpg.Connection,
+    mentor_email: Optional[str] = None,
+    topic: Optional[str] = None,
+    inicio: Optional[datetime] = None,
+    fim: Optional[datetime] = None,
+    default_window_days: int = 30,
+    max_window_days: int = 366
+) -> List[MentoriaInDB]:
+    """
+    Ocorrências ainda não materializadas das séries de um mentor (ou de um tópico) dentro da janela.
+    Recebe a conexão já aberta pela função de listagem que a chama.
+    """
+    inicio, fim = resolve_window(inicio, fim, default_window_days, max_window_days)
+
+    if mentor_email is not None:
+        where, value = "mentor_email = $1", mentor_email
+    else:
+        where, value = "topico = $1", topic
+
+    query = f"""
+        SELECT {SERIE_COLUMNS}
+        FROM mentoria_series
+        WHERE {where} AND data_inicio <= $3 AND (data_fim IS NULL OR data_fim >= $2);
+    """
+    rows = await conn.fetch(query, value, inicio, fim)
+
+    occurrences = []
+    for row in rows:
+        serie = SerieInDB.model_validate(dict(row))
+        occurrences.extend(occurrence_to_mentoria(serie, o) for o in expand_occurrences(serie, inicio, fim))
+    return occurrences
+
+
+async def create_serie(
+    db_conn_manager: _AsyncGeneratorContextManager[asyncpg.Connection],
+    serie: SerieCreate,
+    mentor_email: str
+) -> Optional[SerieInDB]:
+    async with db_conn_manager as conn:
+        query = f"""
+            INSERT INTO mentoria_series (mentor_email, data_inicio, data_fim, frequencia, intervalo, duracao_minutos, status, topico, titulo, descricao)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+            RETURNING {SERIE_COLUMNS};
+        """
+        row = await conn.fetchrow(
+            query,
+            mentor_email,
+            naive_utc(serie.data_inicio),
+            naive_utc(serie.data_fim) if serie.data_fim else None,
+            serie.frequencia.value,
+            serie.intervalo,
+            serie.duracao_minutos,
+            serie.status.value,
+            serie.topico.value,
+            serie.titulo,
+            serie.descricao
+        )
+
+        row = dict(row) if row else None
+
+        return SerieInDB.model_validate(row) if row else None
+
+
+async def get_series_by_mentor(
+    db_conn_manager: _AsyncGeneratorContextManager[asyncpg.Connection],
+    mentor_email: str
+) -> List[SerieInDB]:
+    async with db_conn_manager as conn:
+        query = f"""
+            SELECT {SERIE_COLUMNS}
+            FROM mentoria_series
+            WHERE mentor_email = $1 ORDER BY data_inicio DESC;
+        """
+        rows = await conn.fetch(query, mentor_email)
+
+        return [SerieInDB.model_validate(dict(row)) for row in rows]
+
+
+async def get_serie_by_id(
+    db_conn_manager: _AsyncGeneratorContextManager[asyncpg.Connection],
+    serie_id: int
+) -> Optional[SerieInDB]:
+    async with db_conn_manager as conn:
+        row = await conn.fetchrow(f"SELECT {SERIE_COLUMNS} FROM mentoria_series WHERE id = $1;", serie_id)
+
+        row = dict(row) if row else None
+
+        return SerieInDB.model_validate(row) if row else None
+
+
+async def delete_serie(
+    db_conn_manager: _AsyncGeneratorContextManager[asyncpg.Connection],
+    serie_id: int,
+    current_mentor_email: str
+) -> bool:
+    # Ocorrências já materializadas continuam em `mentorias` (serie_id vira NULL)
+    async with db_conn_manager as conn:
+        query = """
+            DELETE FROM mentoria_series
+            WHERE id = $1 AND mentor_email = $2
+            RETURNING id;
+        """
+        deleted_id = await conn.fetchval(query, serie_id, current_mentor_email)
+        return deleted_id is not None
+
+
+async def cancel_occurrence(
+    db_conn_manager: _AsyncGeneratorContextManager[asyncpg.Connection],
+    serie_id: int,
+    ocorrencia: datetime,
+    current_mentor_email: str
+) -> Union[bool, str]:
+    """
+    Adiciona a ocorrência às exceções da série.
+    Devolve "MATERIALIZED" se a ocorrência já virou uma linha em `mentorias`: ela é removida
+    como uma mentoria comum (DELETE /mentorias/{mentoria_id}), não por aqui.
+    """
+    ocorrencia = naive_utc(ocorrencia)
+    async with db_conn_manager as conn:
+        async with conn.transaction():
+            # FOR UPDATE: mesma trava de materialize_occurrence, para que as duas não se cruzem
+            row = await conn.fetchrow(f"SELECT {SERIE_COLUMNS} FROM mentoria_series WHERE id = $1 FOR UPDATE;", serie_id)
+            if not row:
+                return False
+            serie = SerieInDB.model_validate(dict(row))
+            if serie.mentor_email != current_mentor_email:
+                return "UNAUTHORIZED"
+
+            existing_id = await conn.fetchval(
+                "SELECT id FROM mentorias WHERE serie_id = $1 AND ocorrencia_original = $2;",
+                serie_id, ocorrencia
+            )
+            if existing_id is not None:
+                return "MATERIALIZED"
+            if not is_occurrence(serie, ocorrencia) or ocorrencia in {naive_utc(e) for e in serie.excecoes}:
+                return False
+
+            await conn.execute(
+                "UPDATE mentoria_series SET excecoes = array_append(excecoes, $2) WHERE id = $1;",
+                serie_id, ocorrencia
+            )
+            return True
+
+
+async def materialize_occurrence(
+    db_conn_manager: _AsyncGeneratorContextManager[asyncpg.Connection],
+    serie_id: int,
+    ocorrencia: datetime,
+    current_mentor_email: Optional[str] = None
+) -> Union[int, str, None]:
+    """
+    Garante que a ocorrência exista como linha em `mentorias` e devolve o id dela.
+    Se `current_mentor_email` for informado, só o dono da série pode materializar ("UNAUTHORIZED").
+    Devolve None se a série não existir ou se a data não for uma ocorrência válida (ou foi cancelada).
+    """
+    ocorrencia = naive_utc(ocorrencia)
+    async with db_conn_manager as conn:
+        async with conn.transaction():
+            # FOR UPDATE serializa materializações concorrentes da mesma série
+            row = await conn.fetchrow(f"SELECT {SERIE_COLUMNS} FROM mentoria_series WHERE id = $1 FOR UPDATE;", serie_id)
+            if not row:
+                return None
+            serie = SerieInDB.model_validate(dict(row))
+            if current_mentor_email is not None and serie.mentor_email != current_mentor_email:
+                return "UNAUTHORIZED"
+
+            existing_id = await conn.fetchval(
+                "SELECT id FROM mentorias WHERE serie_id = $1 AND ocorrencia_original = $2;",
+                serie_id, ocorrencia
+            )
+            if existing_id is not None:
+                return existing_id
+            if not is_occurrence(serie, ocorrencia) or ocorrencia in {naive_utc(e) for e in serie.excecoes}:
+                return None
+
+            mentoria_id = await conn.fetchval(
+                """
+                INSERT INTO mentorias (mentor_email, data_hora, duracao_minutos, status, topico, titulo, descricao, serie_id, ocorrencia_original)
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $2)
+                RETURNING id;
+                """,
+                serie.mentor_email,
+                ocorrencia,
+                serie.duracao_minutos,
+                serie.status.value,
+                serie.topico.value,
+                serie.titulo,
+                serie.descricao,
+                serie_id
+            )
+            # A partir de agora a ocorrência é listada pela linha real, não pela expansão
+            await conn.execute(
+                "UPDATE mentoria_series SET excecoes = array_append(excecoes, $2) WHERE id = $1;",
+                serie_id, ocorrencia
+            )
+            return mentoria_id
@@ -0,0 +1,169 @@
+import asyncio
+import contextvars
+from typing import Dict, List, Optional, Tuple
+
+import asyncpg
+
+from app.core.config import settings
+from app.database.session import get_db_connection
+from app.database.instrumentation import current_route
+
+# Origem registrada no log de queries lentas para as escritas em lote
+BATCHER_ROUTE = "enrollment-batcher"
+
+
+def _batch_context() -> contextvars.Context:
+    """
+    Contexto novo para o timer e a task do lote: sem isso eles herdariam a rota (e o profile)
+    da requisição que abriu o lote, embora o lote contenha escritas de vários chamadores.
+    """
+    context = contextvars.Context()
+    context.run(current_route.set, BATCHER_ROUTE)
+    return context
+
+
+class _EnrollmentOp:
+    def __init__(self, kind: str, mentoria_id: int, mentorado_email: str, owner_email: Optional[str], future: asyncio.Future):
+        self.kind = kind # "add" ou "remove"
+        self.mentoria_id = mentoria_id
+        self.mentorado_email = mentorado_email
+        self.owner_email = owner_email # Só para remoções feitas por mentor: a mentoria precisa ser dele
+        self.future = future
+
+
+class EnrollmentBatcher:
+    """
+    Junta inscrições e desinscrições concorrentes por alguns milissegundos (ou até max_size itens)
+    e aplica tudo em uma única transação: um INSERT ... ON CONFLICT e um DELETE ... USING unnest(...).
+    Cada chamador recebe o próprio resultado, igual ao que receberia com a escrita individual.
+    Se o lote falhar (ex: mentoria inexistente -> ForeignKeyViolationError), as operações são
+    reaplicadas uma a uma, para que só o chamador responsável receba a exceção.
+    """
+
+    def __init__(self, enabled: bool, window_ms: float, max_size: int):
+        self.enabled = enabled
+        self.window = window_ms / 1000
+        self.max_size = max_size
+        self.commits = 0 # Transações efetivadas pelo batcher (mostrado pelo benchmarks/enrollment_batching.py)
+        self._pending: List[_EnrollmentOp] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+    async def add(self, mentoria_id: int, mentorado_email: str) -> bool:
+        return await self._submit("add", mentoria_id, mentorado_email, None)
+
+    async def remove(self, mentoria_id: int, mentorado_email: str, owner_email: Optional[str] = None) -> bool:
+        return await self._submit("remove", mentoria_id, mentorado_email, owner_email)
+
+    async def close(self):
+        """Aplica o que estiver pendente e espera os lotes em andamento (usado no shutdown)."""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _submit(self, kind: str, mentoria_id: int, mentorado_email: str, owner_email: Optional[str]) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(_EnrollmentOp(kind, mentoria_id, mentorado_email, owner_email, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush, context=_batch_context())
+        return future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        # create_task copia o contexto corrente, então é chamado dentro do contexto do lote
+        task = _batch_context().run(asyncio.create_task, self._apply(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _apply(self, batch: List[_EnrollmentOp]):
+        try:
+            async with get_db_connection() as conn:
+                async with conn.transaction():
+                    results = await _apply_ops(conn, batch)
+            self.commits += 1
+        except Exception:
+            await self._apply_one_by_one(batch)
+            return
+        for op, result in zip(batch, results):
+            if not op.future.done():
+                op.future.set_result(result)
+
+    async def _apply_one_by_one(self, batch: List[_EnrollmentOp]):
+        for op in batch:
+            try:
+                async with get_db_connection() as conn:
+                    results = await _apply_ops(conn, [op])
+                self.commits += 1
+            except Exception as e:
+                if not op.future.done():
+                    op.future.set_exception(e)
+                continue
+            if not op.future.done():
+                op.future.set_result(results[0])
+
+
+async def _apply_ops(conn: asyncpg.Connection, ops: List[_EnrollmentOp]) -> List[bool]:
+    """
+    Aplica as operações do lote e devolve o resultado de cada uma, na mesma ordem.
+    Inscrições são aplicadas antes das desinscrições; como as operações de um lote são concorrentes,
+    qualquer ordem entre elas é uma execução serial válida.
+    Para chaves repetidas no mesmo lote, só a primeira operação que de fato alterou a linha recebe True,
+    como aconteceria se as escritas fossem feitas uma depois da outra.
+    """
+    results = [False] * len(ops)
+    adds = [(i, op) for i, op in enumerate(ops) if op.kind == "add"]
+    removes = [(i, op) for i, op in enumerate(ops) if op.kind == "remove"]
+
+    if adds:
+        keys = list(dict.fromkeys((op.mentoria_id, op.mentorado_email) for _, op in adds))
+        query = """
+            INSERT INTO mentoria_mentorados (mentoria_id, mentorado_email)
+            SELECT * FROM unnest($1::integer[], $2::varchar[])
+            ON CONFLICT (mentoria_id, mentorado_email) DO NOTHING
+            RETURNING mentoria_id, mentorado_email;
+        """
+        rows = await conn.fetch(query, [k[0] for k in keys], [k[1] for k in keys])
+        inserted = {(row['mentoria_id'], row['mentorado_email']) for row in rows}
+        _assign_first(results, adds, inserted, lambda op: (op.mentoria_id, op.mentorado_email))
+
+    if removes:
+        keys = list(dict.fromkeys((op.mentoria_id, op.mentorado_email, op.owner_email) for _, op in removes))
+        query = """
+            DELETE FROM mentoria_mentorados mm
+            USING unnest($1::integer[], $2::varchar[], $3::varchar[]) AS x(mentoria_id, mentorado_email, owner_email)
+            WHERE mm.mentoria_id = x.mentoria_id
+              AND mm.mentorado_email = x.mentorado_email
+              AND (x.owner_email IS NULL OR EXISTS (
+                  SELECT 1 FROM mentorias m WHERE m.id = x.mentoria_id AND m.mentor_email = x.owner_email
+              ))
+            RETURNING mm.mentoria_id, mm.mentorado_email, x.owner_email;
+        """
+        rows = await conn.fetch(query, [k[0] for k in keys], [k[1] for k in keys], [k[2] for k in keys])
+        deleted = {(row['mentoria_id'], row['mentorado_email'], row['owner_email']) for row in rows}
+        _assign_first(results, removes, deleted, lambda op: (op.mentoria_id, op.mentorado_email, op.owner_email))
+
+    return results
+
+
+def _assign_first(results: List[bool], indexed_ops: List[Tuple[int, _EnrollmentOp]], changed: set, key_of):
+    claimed: Dict[tuple, bool] = {}
+    for i, op in indexed_ops:
+        key = key_of(op)
+        if key in changed and key not in claimed:
+            claimed[key] = True
+            results[i] = True
+
+
+enrollment_batcher = EnrollmentBatcher(
+    enabled=settings.ENROLLMENT_BATCHING,
+    window_ms=settings.ENROLLMENT_BATCH_WINDOW_MS,
+    max_size=settings.ENROLLMENT_BATCH_MAX_SIZE
+)
@@ -0,0 +1,179 @@
+import asyncio
+import random
+import re
+import time
+from collections import deque
+from contextlib import nullcontext
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, List, Optional
+
+import asyncpg
+
+from app.core.config import settings
+from app.core.profiling import current_profile
+from app.models.admin import SlowQueryEntry
+
+# Scope ASGI da requisição atual, definido pelo RequestContextMiddleware (app/core/middleware.py).
+# A rota só é resolvida quando uma query lenta é registrada, a partir do template da rota
+# ("GET /mentorias/{mentoria_id}"), para que as entradas possam ser agrupadas por rota.
+current_scope: ContextVar[Optional[dict]] = ContextVar("current_scope", default=None)
+# Origem fixa para código que roda fora de uma requisição (ex: "enrollment-batcher")
+current_route: ContextVar[Optional[str]] = ContextVar("current_route", default=None)
+
+# Buffer circular com as queries lentas mais recentes
+slow_query_log: deque = deque(maxlen=settings.SLOW_QUERY_LOG_SIZE)
+
+# Referências para as tasks de EXPLAIN (evita que sejam coletadas antes de terminar)
+_explain_tasks: set = set()
+# SQLs com EXPLAIN em andamento, para não disparar vários EXPLAIN da mesma query ao mesmo tempo
+_explain_in_flight: set = set()
+# No máximo um EXPLAIN por vez: ele usa o mesmo pool das requisições, justamente quando há queries lentas
+_explain_semaphore = asyncio.Semaphore(1)
+# Se o pool não tiver conexão livre nesse tempo, o EXPLAIN é descartado em vez de disputar com as requisições
+_EXPLAIN_ACQUIRE_TIMEOUT = 0.5
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL_RE = re.compile(r"(?<![\w$])\d+(?:\.\d+)?\b")
+_LOCKING_CLAUSE_RE = re.compile(r"\bFOR\s+(?:NO\s+KEY\s+)?(?:UPDATE|SHARE|KEY\s+SHARE)\b", re.IGNORECASE)
+
+
+def normalize_sql(query: str) -> str:
+    """
+    Colapsa espaços e troca literais por '?', para que a mesma query sempre gere o mesmo texto.
+    """
+    query = _STRING_LITERAL_RE.sub("?", query)
+    query = _NUMBER_LITERAL_RE.sub("?", query)
+    return _WHITESPACE_RE.sub(" ", query).strip().rstrip(";").strip()
+
+
+def params_shape(args: tuple) -> List[str]:
+    shape = []
+    for arg in args:
+        if isinstance(arg, (list, tuple)):
+            shape.append(f"{type(arg).__name__}[{len(arg)}]")
+        else:
+            shape.append(type(arg).__name__)
+    return shape
+
+
+def route_label(scope: Optional[dict]) -> Optional[str]:
+    if scope is None:
+        return None
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path")
+    return f"{scope.get('method')} {path}"
+
+
+def get_slow_queries() -> List[SlowQueryEntry]:
+    # Mais recentes primeiro
+    return list(reversed(slow_query_log))
+
+
+def clear_slow_queries():
+    slow_query_log.clear()
+
+
+def _can_analyze(sql: str) -> bool:
+    # ANALYZE executa a query: só para SELECTs simples, sem FOR UPDATE/SHARE (que travam linhas)
+    return sql.upper().startswith("SELECT") and not _LOCKING_CLAUSE_RE.search(sql)
+
+
+async def _capture_explain(pool: asyncpg.Pool, entry: SlowQueryEntry, query: str, args: tuple):
+    """
+    Roda o EXPLAIN em uma conexão separada, fora do caminho da requisição, em uma transação
+    somente leitura que sempre sofre rollback. Escritas e SELECT ... FOR UPDATE recebem só
+    EXPLAIN (sem ANALYZE), para não consumir sequences nem segurar locks.
+    """
+    try:
+        if _explain_semaphore.locked():
+            entry.explain_error = "EXPLAIN skipped: another EXPLAIN is already running"
+            return
+        async with _explain_semaphore:
+            try:
+                conn = await pool.acquire(timeout=_EXPLAIN_ACQUIRE_TIMEOUT)
+            except asyncio.TimeoutError:
+                entry.explain_error = "EXPLAIN skipped: no free connection in the pool"
+                return
+            try:
+                tr = conn.transaction(readonly=True)
+                await tr.start()
+                try:
+                    timeout_ms = max(5000, int(settings.SLOW_QUERY_THRESHOLD_MS * 10))
+                    await conn.execute(f"SET LOCAL statement_timeout = {timeout_ms};")
+                    options = "ANALYZE, BUFFERS" if _can_analyze(entry.sql) else "COSTS"
+                    rows = await conn.fetch(f"EXPLAIN ({options}) {query}", *args)
+                    entry.explain = [row[0] for row in rows]
+                finally:
+                    await tr.rollback()
+            finally:
+                await pool.release(conn)
+    except Exception as e:
+        entry.explain_error = str(e)
+    finally:
+        _explain_in_flight.discard(entry.sql)
+
+
+class InstrumentedConnection:
+    """
+    Envolve uma asyncpg.Connection medindo fetch/fetchrow/fetchval/execute.
+    Queries acima de SLOW_QUERY_THRESHOLD_MS vão para o slow_query_log; uma amostra delas
+    recebe um EXPLAIN (ANALYZE, BUFFERS) capturado em background.
+    Qualquer outro atributo é repassado para a conexão original.
+    """
+
+    def __init__(self, conn: asyncpg.Connection, pool: asyncpg.Pool):
+        self._conn = conn
+        self._pool = pool
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+    async def fetch(self, query: str, *args, **kwargs):
+        return await self._timed("fetch", query, args, kwargs)
+
+    async def fetchrow(self, query: str, *args, **kwargs):
+        return await self._timed("fetchrow", query, args, kwargs)
+
+    async def fetchval(self, query: str, *args, **kwargs):
+        return await self._timed("fetchval", query, args, kwargs)
+
+    async def execute(self, query: str, *args, **kwargs):
+        return await self._timed("execute", query, args, kwargs)
+
+    async def _timed(self, method: str, query: str, args: tuple, kwargs: dict):
+        profile = current_profile.get()
+        if profile is not None and profile.active:
+            # ";" separa as fases no formato collapsed
+            phase = profile.phase(f"query:{method} {normalize_sql(query)[:80]}".replace(";", ","))
+        else:
+            phase = nullcontext()
+
+        start = time.perf_counter()
+        with phase:
+            try:
+                return await getattr(self._conn, method)(query, *args, **kwargs)
+            finally:
+                duration_ms = (time.perf_counter() - start) * 1000
+                if duration_ms >= settings.SLOW_QUERY_THRESHOLD_MS:
+                    self._record_slow_query(method, query, args, duration_ms)
+
+    def _record_slow_query(self, method: str, query: str, args: tuple, duration_ms: float):
+        entry = SlowQueryEntry(
+            timestamp=datetime.now(timezone.utc),
+            route=current_route.get() or route_label(current_scope.get()),
+            method=method,
+            sql=normalize_sql(query),
+            params_shape=params_shape(args),
+            duration_ms=round(duration_ms, 3),
+        )
+        slow_query_log.append(entry)
+        print(f"[slow-query] {entry.duration_ms}ms {entry.route or '-'} {entry.method} {entry.sql} params={entry.params_shape}")
+
+        if entry.sql in _explain_in_flight or random.random() >= settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE:
+            return
+        _explain_in_flight.add(entry.sql)
+        task = asyncio.create_task(_capture_explain(self._pool, entry, query, args))
+        _explain_tasks.add(task)
+        task.add_done_callback(_explain_tasks.discard)
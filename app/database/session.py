@@ -1,6 +1,8 @@
 import asyncpg
 from app.core.config import settings
 from contextlib import asynccontextmanager
+from app.database.instrumentation import InstrumentedConnection
+from app.core.profiling import profile_phase
 
 # Variável global para o pool de conexões
 db_pool = None
@@ -28,7 +30,7 @@ async def close_db():
 @asynccontextmanager
 async def get_db_connection():
     """
-    Obtém uma conexão do pool.
+    Obtém uma conexão do pool, envolvida pelo InstrumentedConnection (log de queries lentas).
     """
     if not db_pool:
         # Isso não deveria acontecer se connect_db foi chamado no startup
@@ -36,8 +38,9 @@ async def get_db_connection():
     
     conn = None
     try:
-        conn = await db_pool.acquire()
-        yield conn
+        with profile_phase("pool_acquire"):
+            conn = await db_pool.acquire()
+        yield InstrumentedConnection(conn, db_pool)
     finally:
         if conn:
             await db_pool.release(conn)
@@ -52,7 +55,9 @@ async def create_tables_if_not_exist():
                 data_hora TIMESTAMP NOT NULL,
                 duracao_minutos INTEGER NOT NULL,
                 status VARCHAR(20) NOT NULL CHECK (status IN ('agendada', 'concluída', 'cancelada', 'disponível')),
-                topico TEXT NOT NULL
+                topico TEXT NOT NULL,
+                titulo TEXT NOT NULL,
+                descricao TEXT
             );
         """)
         await conn.execute("""
@@ -62,4 +67,34 @@ async def create_tables_if_not_exist():
                 PRIMARY KEY (mentoria_id, mentorado_email)
             );
         """)
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS mentoria_series (
+                id SERIAL PRIMARY KEY,
+                mentor_email VARCHAR(255) NOT NULL,
+                data_inicio TIMESTAMP NOT NULL,
+                data_fim TIMESTAMP,
+                frequencia VARCHAR(10) NOT NULL CHECK (frequencia IN ('diaria', 'semanal')),
+                intervalo INTEGER NOT NULL DEFAULT 1 CHECK (intervalo >= 1),
+                excecoes TIMESTAMP[] NOT NULL DEFAULT '{}',
+                duracao_minutos INTEGER NOT NULL,
+                status VARCHAR(20) NOT NULL CHECK (status IN ('agendada', 'concluída', 'cancelada', 'disponível')),
+                topico VARCHAR(20) NOT NULL CHECK (topico IN ('carreiras', 'liderancas', 'financeiro', 'negocios')),
+                titulo TEXT NOT NULL,
+                descricao TEXT
+            );
+        """)
+        await conn.execute("CREATE INDEX IF NOT EXISTS mentoria_series_mentor_email_idx ON mentoria_series (mentor_email);")
+        await conn.execute("CREATE INDEX IF NOT EXISTS mentoria_series_topico_idx ON mentoria_series (topico);")
+        # Ocorrências materializadas apontam para a série de origem
+        await conn.execute("""
+            ALTER TABLE mentorias
+                ADD COLUMN IF NOT EXISTS titulo TEXT, -- Bancos criados antes das colunas (sem NOT NULL por causa das linhas existentes)
+                ADD COLUMN IF NOT EXISTS descricao TEXT,
+                ADD COLUMN IF NOT EXISTS serie_id INTEGER REFERENCES mentoria_series(id) ON DELETE SET NULL,
+                ADD COLUMN IF NOT EXISTS ocorrencia_original TIMESTAMP;
+        """)
+        await conn.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS mentorias_serie_ocorrencia_idx
+            ON mentorias (serie_id, ocorrencia_original) WHERE serie_id IS NOT NULL;
+        """)
         print("Tabelas verificadas/criadas.")
\ No newline at end of file
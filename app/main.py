@@ -2,8 +2,10 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
-from app.routers import mentoria_router
+from app.routers import mentoria_router, serie_router, admin_router
 from app.database.session import connect_db, close_db, create_tables_if_not_exist # Adicionado create_tables_if_not_exist
+from app.core.middleware import RequestContextMiddleware
+from app.database.batching import enrollment_batcher
 from app.core.config import settings # Para debug, se necessário
 
 @asynccontextmanager
@@ -17,6 +19,7 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     print("Encerrando aplicação...")
+    await enrollment_batcher.close() # Aplica inscrições ainda pendentes antes de fechar o pool
     await close_db()
 
 app = FastAPI(
@@ -26,7 +29,12 @@ app = FastAPI(
     lifespan=lifespan # Novo modo de definir startup/shutdown events
 )
 
+app.include_router(serie_router.router) # Antes do mentoria_router: "/mentorias/series" conflita com "/mentorias/{mentoria_id}"
 app.include_router(mentoria_router.router)
+app.include_router(admin_router.router)
+
+# Rota atual (log de queries lentas) e profiling sob demanda; middleware ASGI puro para não pesar nas requisições
+app.add_middleware(RequestContextMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
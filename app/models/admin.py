@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+class SlowQueryEntry(BaseModel):
+    timestamp: datetime
+    route: Optional[str]
+    method: str # fetch, fetchrow, fetchval ou execute
+    sql: str # SQL normalizado (espaços colapsados, literais trocados por '?')
+    params_shape: List[str] # Tipo de cada parâmetro, sem os valores
+    duration_ms: float
+    explain: Optional[List[str]] = None # Preenchido em background quando a query é amostrada
+    explain_error: Optional[str] = None
+
+class ProfilePhase(BaseModel):
+    name: str # Caminho da fase, ex: "endpoint;query:fetch SELECT ..."
+    start_ms: float # Relativo ao início do profiling
+    duration_ms: float
+
+class ProfileSummary(BaseModel):
+    id: str
+    timestamp: datetime
+    route: str
+    duration_ms: float
+    sample_count: int
+    phases: List[ProfilePhase]
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, field_validator
+from pydantic import BaseModel, EmailStr, Field, field_validator
 from typing import List, Optional
 from datetime import datetime
 from enum import Enum
@@ -15,6 +15,10 @@ class MentoriaTopic(str, Enum):
     FINANCEIRO = "financeiro"
     NEGOCIOS = "negocios"
 
+class SerieFrequencia(str, Enum):
+    DIARIA = "diaria"
+    SEMANAL = "semanal"
+
 class UserType(str, Enum):
     MENTOR = "Mentor"
     MENTORADO = "Mentorado" # Exemplo de futuro tipo
@@ -40,7 +44,7 @@ class MentoriaUpdate(BaseModel):
     descricao: Optional[str] = None
 
 class MentoriaInDB(MentoriaBase):
-    id: int
+    id: Optional[int] # None para ocorrências de série ainda não materializadas
     mentor_email: EmailStr
     data_hora: datetime
     duracao_minutos: int
@@ -48,6 +52,28 @@ class MentoriaInDB(MentoriaBase):
     topico: MentoriaTopic
     titulo: str
     descricao: Optional[str]
+    serie_id: Optional[int] = None # Série de origem, se a mentoria for uma ocorrência de série
+
+# --- Séries (mentorias recorrentes) ---
+
+class SerieBase(BaseModel):
+    data_inicio: datetime # Primeira ocorrência (define o horário e o dia da semana)
+    data_fim: Optional[datetime] = None # Última data possível de ocorrência; None = sem fim
+    frequencia: SerieFrequencia
+    intervalo: int = Field(1, ge=1) # A cada quantos dias/semanas
+    duracao_minutos: int
+    status: MentoriaStatus
+    topico: MentoriaTopic
+    titulo: str
+    descricao: Optional[str]
+
+class SerieCreate(SerieBase):
+    pass # mentor_email vem do token do usuário logado
+
+class SerieInDB(SerieBase):
+    id: int
+    mentor_email: EmailStr
+    excecoes: List[datetime] = [] # Ocorrências canceladas ou já materializadas em `mentorias`
 
 class MentoradoEmail(BaseModel):
     mentorado_email: EmailStr
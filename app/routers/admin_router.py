@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Path
+from fastapi.responses import PlainTextResponse
+from typing import List
+
+from app.models.mentoria import UserType
+from app.models.admin import SlowQueryEntry, ProfileSummary
+from app.auth.security import RoleChecker
+from app.database import instrumentation
+from app.core import profiling
+from app.core.profiling import ProfiledRoute
+
+
+router = APIRouter(
+    route_class=ProfiledRoute,
+    prefix="/admin",
+    tags=["Admin"],
+    dependencies=[Depends(RoleChecker(allowed_roles=[UserType.ADMIN]))]
+)
+
+# --- Log de queries lentas ---
+
+@router.get(
+    "/slow-queries",
+    response_model=List[SlowQueryEntry]
+)
+async def list_slow_queries():
+    """Lista as queries lentas mais recentes (com EXPLAIN, quando amostradas)."""
+    return instrumentation.get_slow_queries()
+
+
+@router.delete(
+    "/slow-queries",
+    status_code=status.HTTP_204_NO_CONTENT
+)
+async def clear_slow_queries():
+    instrumentation.clear_slow_queries()
+    return None
+
+
+# --- Profiling por requisição ---
+# Um admin envia o próprio token no header X-Profile-Request; a resposta traz X-Profile-Id.
+
+@router.get(
+    "/profiles",
+    response_model=List[ProfileSummary]
+)
+async def list_profiles():
+    """Lista os profiles mais recentes, com a duração de cada fase."""
+    return profiling.get_profiles()
+
+
+@router.get(
+    "/profiles/{profile_id}",
+    response_model=ProfileSummary
+)
+async def get_profile(profile_id: str = Path(...)):
+    profile = profiling.get_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return profile.summary()
+
+
+@router.get(
+    "/profiles/{profile_id}/collapsed",
+    response_class=PlainTextResponse
+)
+async def download_profile_collapsed(profile_id: str = Path(...)):
+    """Pilhas no formato collapsed, para flamegraph.pl ou speedscope."""
+    profile = profiling.get_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return PlainTextResponse(
+        profile.collapsed(),
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile.id}.collapsed"'}
+    )
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body, Path, Query
 from typing import List, Optional
+from datetime import datetime
 # Importe _AsyncGeneratorContextManager para type hinting se não estiver globalmente disponível
 from contextlib import _AsyncGeneratorContextManager
 import asyncpg # Para o type hint da dependência de conexão
@@ -8,16 +9,30 @@ from app.models.mentoria import (
     MentoriaCreate, MentoriaUpdate, MentoriaInDB,
     MentoradoEmail, TokenData, UserType, MentoradoInMentoria
 )
-from app.crud import mentoria_crud # Importa o módulo
+from app.crud import mentoria_crud, serie_crud # Importa o módulo
 from app.auth.security import get_current_active_mentor, RoleChecker, get_current_user
 from app.database.session import get_db_connection
+from app.core.config import settings
+from app.core.profiling import ProfiledRoute
 
 
 router = APIRouter(
+    route_class=ProfiledRoute,
     prefix="/mentorias",
     tags=["Mentorias"]
 )
 
+def _series_window(inicio: Optional[datetime], fim: Optional[datetime]):
+    # Janela de expansão das séries: limitada para que o custo da listagem não dependa do cliente
+    try:
+        return serie_crud.resolve_window(
+            inicio, fim,
+            default_window_days=settings.SERIES_DEFAULT_WINDOW_DAYS,
+            max_window_days=settings.SERIES_MAX_WINDOW_DAYS
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
 # --- Endpoints de Mentoria ---
 
 @router.post(
@@ -49,13 +64,18 @@ async def create_new_mentoria(
     dependencies=[Depends(RoleChecker(allowed_roles=[UserType.MENTOR, UserType.MENTORADO]))]
 )
 async def list_mentorias(
+    inicio: Optional[datetime] = Query(None, description="Início da janela em que as ocorrências de séries são expandidas (padrão: agora)"),
+    fim: Optional[datetime] = Query(None, description="Fim da janela de expansão das séries (padrão: inicio + SERIES_DEFAULT_WINDOW_DAYS)"),
     current_user: TokenData = Depends(get_current_user),
     conn_manager: _AsyncGeneratorContextManager[asyncpg.Connection] = Depends(get_db_connection)
 ):
+    inicio, fim = _series_window(inicio, fim)
     mentorias = await mentoria_crud.get_mentorias_by_user(
         db_conn_manager=conn_manager,
         email=current_user.username,
-        type = current_user.type
+        type = current_user.type,
+        inicio=inicio,
+        fim=fim
     )
     return mentorias
 
@@ -65,11 +85,16 @@ async def list_mentorias(
 )
 async def list_mentorias_by_topic(
     topic: str = Path(...),
+    inicio: Optional[datetime] = Query(None, description="Início da janela em que as ocorrências de séries são expandidas (padrão: agora)"),
+    fim: Optional[datetime] = Query(None, description="Fim da janela de expansão das séries (padrão: inicio + SERIES_DEFAULT_WINDOW_DAYS)"),
     conn_manager: _AsyncGeneratorContextManager[asyncpg.Connection] = Depends(get_db_connection)
 ):
+    inicio, fim = _series_window(inicio, fim)
     mentorias = await mentoria_crud.get_mentorias_by_topic(
         db_conn_manager=conn_manager,
-        topic=topic
+        topic=topic,
+        inicio=inicio,
+        fim=fim
     )
     return mentorias
 
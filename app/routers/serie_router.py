@@ -0,0 +1,193 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Path
+from typing import List
+from datetime import datetime
+from contextlib import _AsyncGeneratorContextManager
+import asyncpg # Para o type hint da dependência de conexão
+
+from app.models.mentoria import (
+    MentoriaUpdate, MentoriaInDB, SerieCreate, SerieInDB, TokenData, UserType
+)
+from app.crud import mentoria_crud, serie_crud
+from app.auth.security import get_current_active_mentor, RoleChecker, get_current_user
+from app.database.session import get_db_connection
+from app.core.profiling import ProfiledRoute
+
+
+# Incluído antes do mentoria_router em app/main.py, senão "/mentorias/series" cairia em "/mentorias/{mentoria_id}"
+router = APIRouter(
+    route_class=ProfiledRoute,
+    prefix="/mentorias/series",
+    tags=["Séries de Mentorias"]
+)
+
+# --- Endpoints de Série ---
+
+@router.post(
+    "",
+    response_model=SerieInDB,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(RoleChecker(allowed_roles=[UserType.MENTOR]))]
+)
+async def create_new_serie(
+    serie_data: SerieCreate,
+    current_user: TokenData = Depends(get_current_active_mentor),
+    conn_manager: _AsyncGeneratorContextManager[asyncpg.Connection] = Depends(get_db_connection)
+):
+    created_serie = await serie_crud.create_serie(
+        db_conn_manager=conn_manager,
+        serie=serie_data,
+        mentor_email=current_user.username
+    )
+    if not created_serie:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create serie")
+    return created_serie
+
+
+@router.get(
+    "",
+    response_model=List[SerieInDB],
+    dependencies=[Depends(RoleChecker(allowed_roles=[UserType.MENTOR]))]
+)
+async def list_series(
+    current_user: TokenData = Depends(get_current_active_mentor),
+    conn_manager: _AsyncGeneratorContextManager[asyncpg.Connection] = Depends(get_db_connection)
+):
+    return await serie_crud.get_series_by_mentor(
+        db_conn_manager=conn_manager,
+        mentor_email=current_user.username
+    )
+
+
+@router.get(
+    "/{serie_id}",
+    response_model=SerieInDB
+)
+async def get_single_serie(
+    serie_id: int = Path(..., ge=1),
+    current_user: TokenData = Depends(get_current_user),
+    conn_manager: _AsyncGeneratorContextManager[asyncpg.Connection] = Depends(get_db_connection)
+):
+    serie = await serie_crud.get_serie_by_id(
+        db_conn_manager=conn_manager,
+        serie_id=serie_id
+    )
+    if not serie:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Serie not found")
+    return serie
+
+
+@router.delete(
+    "/{serie_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(RoleChecker(allowed_roles=[UserType.MENTOR]))]
+)
+async def delete_existing_serie(
+    serie_id: int = Path(..., ge=1),
+    current_user: TokenData = Depends(get_current_active_mentor),
+    conn_manager: _AsyncGeneratorContextManager[asyncpg.Connection] = Depends(get_db_connection)
+):
+    success = await serie_crud.delete_serie(
+        db_conn_manager=conn_manager,
+        serie_id=serie_id,
+        current_mentor_email=current_user.username
+    )
+    if not success:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Serie not found or not authorized to delete")
+    return None
+
+
+# --- Endpoints de Ocorrências ---
+# Uma ocorrência é identificada pela série e pela data/hora original (ISO 8601).
+
+@router.put(
+    "/{serie_id}/ocorrencias/{ocorrencia}",
+    response_model=MentoriaInDB,
+    dependencies=[Depends(RoleChecker(allowed_roles=[UserType.MENTOR]))]
+)
+async def update_occurrence(
+    mentoria_data: MentoriaUpdate,
+    serie_id: int = Path(..., ge=1),
+    ocorrencia: datetime = Path(...),
+    current_user: TokenData = Depends(get_current_active_mentor)
+):
+    # Editar uma ocorrência a materializa em `mentorias`; a partir daí ela é uma mentoria comum
+    mentoria_id = await serie_crud.materialize_occurrence(
+        db_conn_manager=get_db_connection(),
+        serie_id=serie_id,
+        ocorrencia=ocorrencia,
+        current_mentor_email=current_user.username
+    )
+    if mentoria_id == "UNAUTHORIZED":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to update this serie")
+    if mentoria_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Serie or occurrence not found")
+
+    updated_mentoria = await mentoria_crud.update_mentoria(
+        db_conn_manager=get_db_connection(),
+        mentoria_id=mentoria_id,
+        mentoria_update=mentoria_data,
+        current_mentor_email=current_user.username
+    )
+    if updated_mentoria == "UNAUTHORIZED":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to update this mentoria")
+    if not updated_mentoria:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Mentoria not found or update failed")
+    return updated_mentoria
+
+
+@router.delete(
+    "/{serie_id}/ocorrencias/{ocorrencia}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(RoleChecker(allowed_roles=[UserType.MENTOR]))]
+)
+async def cancel_occurrence(
+    serie_id: int = Path(..., ge=1),
+    ocorrencia: datetime = Path(...),
+    current_user: TokenData = Depends(get_current_active_mentor),
+    conn_manager: _AsyncGeneratorContextManager[asyncpg.Connection] = Depends(get_db_connection)
+):
+    success = await serie_crud.cancel_occurrence(
+        db_conn_manager=conn_manager,
+        serie_id=serie_id,
+        ocorrencia=ocorrencia,
+        current_mentor_email=current_user.username
+    )
+    if success == "UNAUTHORIZED":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to update this serie")
+    if success == "MATERIALIZED":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Occurrence already materialized as a mentoria; delete it with DELETE /mentorias/{mentoria_id}"
+        )
+    if not success:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Serie or occurrence not found")
+    return None
+
+
+@router.post(
+    "/{serie_id}/ocorrencias/{ocorrencia}/mentorados",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(RoleChecker(allowed_roles=[UserType.MENTORADO]))]
+)
+async def add_mentorado_to_an_occurrence(
+    serie_id: int = Path(..., ge=1),
+    ocorrencia: datetime = Path(...),
+    current_user: TokenData = Depends(get_current_user)
+):
+    # Inscrever-se em uma ocorrência a materializa em `mentorias`
+    mentoria_id = await serie_crud.materialize_occurrence(
+        db_conn_manager=get_db_connection(),
+        serie_id=serie_id,
+        ocorrencia=ocorrencia
+    )
+    if mentoria_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Serie or occurrence not found")
+
+    success = await mentoria_crud.add_mentorado_to_mentoria(
+        db_conn_manager=get_db_connection(),
+        mentoria_id=mentoria_id,
+        mentorado_email=current_user.username
+    )
+    if not success:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Mentoria not found or not authorized, or mentorado could not be added/already in mentoria")
+    return {"message": "Mentorado added successfully to mentoria", "mentoria_id": mentoria_id}
@@ -0,0 +1,110 @@
+"""
+Benchmark de inscrições com e sem o EnrollmentBatcher.
+
+Precisa de um PostgreSQL configurado no .env (as tabelas que faltarem são criadas, e as colunas
+que faltarem em `mentorias` são adicionadas).
+Uso:
+    python -m benchmarks.enrollment_batching --total 5000 --concurrency 200
+
+Para cada modo, inscreve e depois desinscreve `total` mentorados em uma mentoria temporária,
+com `concurrency` requisições simultâneas, e mostra inscrições/s e commits/s.
+Os commits aparecem de duas formas: os contados pela aplicação (um por operação sem o batcher,
+EnrollmentBatcher.commits com ele) e os medidos por pg_stat_database.xact_commit (aproximado).
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+from app.crud import mentoria_crud
+from app.database import session
+from app.database.batching import enrollment_batcher
+from app.models.mentoria import MentoriaCreate, MentoriaStatus, MentoriaTopic, UserType
+
+
+async def _xact_commits() -> int:
+    async with session.get_db_connection() as conn:
+        # As estatísticas são enviadas pelos backends com atraso; espera e limpa o snapshot
+        await asyncio.sleep(1.5)
+        await conn.execute("SELECT pg_stat_clear_snapshot();")
+        return await conn.fetchval(
+            "SELECT xact_commit FROM pg_stat_database WHERE datname = current_database();"
+        )
+
+
+async def _run(mentoria_id: int, total: int, concurrency: int, batched: bool) -> dict:
+    enrollment_batcher.enabled = batched
+    semaphore = asyncio.Semaphore(concurrency)
+    emails = [f"bench{i}@example.com" for i in range(total)]
+
+    async def enroll(email: str):
+        async with semaphore:
+            ok = await mentoria_crud.add_mentorado_to_mentoria(session.get_db_connection(), mentoria_id, email)
+            assert ok, f"inscrição falhou para {email}"
+
+    async def unenroll(email: str):
+        async with semaphore:
+            ok = await mentoria_crud.remove_mentorado_from_mentoria(
+                session.get_db_connection(), mentoria_id, None, email, UserType.MENTORADO
+            )
+            assert ok, f"desinscrição falhou para {email}"
+
+    enrollment_batcher.commits = 0
+    commits_before = await _xact_commits()
+    start = time.perf_counter()
+    await asyncio.gather(*(enroll(e) for e in emails))
+    await asyncio.gather(*(unenroll(e) for e in emails))
+    elapsed = time.perf_counter() - start
+    # Desconta as transações das próprias leituras de xact_commit (valor aproximado:
+    # inclui também o reset que o pool do asyncpg faz ao devolver cada conexão)
+    commits = await _xact_commits() - commits_before - 2
+    # Sem o batcher cada inscrição/desinscrição é um comando em autocommit
+    app_commits = enrollment_batcher.commits if batched else 2 * total
+
+    return {
+        "modo": "com batcher" if batched else "sem batcher",
+        "operacoes_por_s": 2 * total / elapsed,
+        "commits_por_s": app_commits / elapsed,
+        "commits": app_commits,
+        "commits_pg_stat": commits,
+        "segundos": elapsed,
+    }
+
+
+async def main(total: int, concurrency: int):
+    await session.connect_db()
+    await session.create_tables_if_not_exist()
+    try:
+        mentoria = await mentoria_crud.create_mentoria(
+            session.get_db_connection(),
+            MentoriaCreate(
+                data_hora=datetime.now(),
+                duracao_minutos=60,
+                status=MentoriaStatus.DISPONIVEL,
+                topico=MentoriaTopic.CARREIRAS,
+                titulo="Benchmark de inscrições",
+                descricao=None
+            ),
+            "benchmark@example.com"
+        )
+        try:
+            for batched in (False, True):
+                result = await _run(mentoria.id, total, concurrency, batched)
+                print(
+                    f"{result['modo']:>12}: {result['operacoes_por_s']:10.1f} inscrições+desinscrições/s | "
+                    f"{result['commits_por_s']:10.1f} commits/s | {result['commits']} commits "
+                    f"(pg_stat: {result['commits_pg_stat']}) em {result['segundos']:.2f}s"
+                )
+            await enrollment_batcher.close()
+        finally:
+            await mentoria_crud.delete_mentoria(session.get_db_connection(), mentoria.id, "benchmark@example.com")
+    finally:
+        await session.close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--total", type=int, default=5000, help="Mentorados inscritos por modo")
+    parser.add_argument("--concurrency", type=int, default=200, help="Requisições simultâneas")
+    args = parser.parse_args()
+    asyncio.run(main(args.total, args.concurrency))